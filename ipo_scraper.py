@@ -5,44 +5,163 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException # Added NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from webdriver_manager.core.driver_cache import DriverCacheManager
+from selectolax.lexbor import LexborHTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import util as mp_util
+import multiprocessing
+from urllib.parse import urlparse
+import httpx
+import argparse
+import asyncio
+import functools
+import shutil
+import os
+import shelve
+import csv
 import time
 import re
 
-def scrape_ipo_subscription_data(excel_file_path, url_column_name="URL_for_IPO_details"):
+CAPTION_TEXT = 'IPO Bidding Live Updates from BSE, NSE'
+_TITLE_RE = re.compile(r'^(.*?) IPO')
+_URL_SLUG_RE = re.compile(r'/([^/]+)-ipo')
+# Browser-side lookups for the Selenium fallback
+CAPTION_XPATH = f"//caption[contains(., '{CAPTION_TEXT}')]"
+# Last row across all tbody elements of the first captioned table, as the HTTP path picks
+LAST_ROW_XPATH = f"(({CAPTION_XPATH})[1]/ancestor::table[1]//tbody/tr)[last()]"
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+MAX_CONCURRENT_REQUESTS = 8 # Upper bound on simultaneous HTTP requests
+SELENIUM_WORKERS = 4 # Number of Chrome instances used for the browser fallback
+CACHE_FILE = 'ipo_cache.db' # Scraped rows keyed by URL, reused across runs
+CACHE_TTL = 24 * 60 * 60 # Seconds a cached row stays valid; live IPOs keep changing
+MIN_HOST_INTERVAL = 1.0 # Seconds between requests to the same host, to be polite
+RETRY_ATTEMPTS = 3 # Tries per URL before giving up on transient failures
+PAGE_LOAD_TIMEOUT = 20 # Seconds per browser page load attempt
+MAX_RETRY_AFTER = 60 # Cap in seconds on a server's Retry-After before retrying
+# HTTP statuses a real browser may get past (bot blocks); other errors are final
+BROWSER_FALLBACK_STATUSES = {403}
+OUTPUT_COLUMNS = ["Company Name", "IPO Link", "QIB Subscription",
+                  "NII Subscription", "RII Subscription", "Total Subscription"]
+
+# Resources the browser fallback never needs to read the subscription table
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp",
+    "*.woff*", "*.ttf", "*.css", "*.mp4",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*", "*adsbygoogle*",
+]
+
+# Per-process driver, set up by _init_driver() in each fallback worker
+_driver = None
+# Next allowed request time per host, shared with the main process's HTTP fetches
+_host_next_slot = None
+_host_lock = None
+
+
+def _empty_row(url, company_name="N/A"):
+    """Returns a result row with every subscription field set to N/A."""
+    return {
+        "Company Name": company_name,
+        "IPO Link": url,
+        "QIB Subscription": "N/A",
+        "NII Subscription": "N/A",
+        "RII Subscription": "N/A",
+        "Total Subscription": "N/A"
+    }
+
+
+def _extract_company_name(title, url):
+    """Extracts the company name from the page title, falling back to the URL."""
+    title_match = _TITLE_RE.match(title)
+    if title_match:
+        return title_match.group(1).strip()
+    # Fallback to URL parsing for company name
+    slug_match = _URL_SLUG_RE.search(url)
+    return slug_match.group(1).replace('-', ' ').title() if slug_match else "N/A"
+
+
+def _parse_subscription_table(html, url):
     """
-    Scrapes QIB, NII, RII, and Total subscription data from IPO company pages.
+    Parses the subscription table out of the server-rendered page HTML.
 
     Args:
-        excel_file_path (str): Path to the Excel file containing IPO links.
-        url_column_name (str): The name of the column in the Excel file that
-                                contains the corrected IPO URLs.
+        html (str): Raw HTML of the IPO page.
+        url (str): The IPO page URL.
 
     Returns:
-        pandas.DataFrame: A DataFrame containing the scraped data, or None if an error occurs.
+        dict: The scraped row, or None if the table caption is not in the HTML.
     """
-    try:
-        # Read the Excel file
-        df = pd.read_excel(excel_file_path)
-        
-        # Get the list of URLs from the specified column
-        ipo_urls = df[url_column_name].dropna().tolist()
+    tree = LexborHTMLParser(html)
+    title_node = tree.css_first('title')
+    company_name = _extract_company_name(title_node.text() if title_node else "", url)
 
-    except FileNotFoundError:
-        print(f"Error: Excel file not found at {excel_file_path}")
-        return None
-    except KeyError:
-        print(f"Error: Column '{url_column_name}' not found in the Excel file.")
-        print(f"Available columns: {df.columns.tolist()}")
-        return None
-    except Exception as e:
-        print(f"Error reading Excel file: {e}")
+    # Find the table by its caption
+    table_element = None
+    for caption in tree.css('table caption'):
+        if CAPTION_TEXT in caption.text():
+            table_element = caption.parent
+            break
+    if table_element is None:
         return None
 
+    row = _empty_row(url, company_name)
+    rows = table_element.css('tbody tr')
+    if not rows:
+        print(f"No rows found in the table for {company_name} ({url})")
+        return row
+
+    # The last row contains the final subscription data
+    last_row = rows[-1]
+    for key in ("QIB", "NII", "RII", "Total"):
+        td = last_row.css_first(f'td[data-title*="{key}"]')
+        if td is not None:
+            row[f"{key} Subscription"] = td.text(strip=True)
+    return row
+
+
+def _install_chromedriver():
+    """
+    Returns the chromedriver path from webdriver_manager.
+
+    The downloaded driver is reused from ~/.wdm for DRIVER_CACHE_TIME days
+    (default 1) before webdriver_manager checks for a newer one.
+    """
+    cache_days = int(os.environ.get("DRIVER_CACHE_TIME", 1))
+    return ChromeDriverManager(cache_manager=DriverCacheManager(valid_range=cache_days)).install()
+
+
+@functools.lru_cache(maxsize=None)
+def chromedriver_path():
+    """
+    Resolves the chromedriver binary once.
+
+    Checks, in order: the CHROMEDRIVER_PATH environment variable, a chromedriver
+    on PATH, and finally webdriver_manager. Pinning the path, e.g.
+
+        export CHROMEDRIVER_PATH=/usr/local/bin/chromedriver
+
+    skips webdriver_manager's Chrome version probe and download check entirely.
+    """
+    return os.environ.get('CHROMEDRIVER_PATH') or shutil.which('chromedriver') or _install_chromedriver()
+
+
+def _create_driver(driver_url=None, driver_path=None):
+    """
+    Initializes a headless Chrome WebDriver, or returns None on failure.
+
+    Args:
+        driver_url (str): URL of an already running chromedriver or Selenium
+                          server. If None, a local chromedriver is started.
+        driver_path (str): Path of the local chromedriver binary. Resolved
+                           with chromedriver_path() if not given.
+    """
     # Setup Chrome options
     chrome_options = Options()
+    # Return from driver.get() at DOMContentLoaded instead of waiting for every
+    # image and tracker; the caption wait below covers the rest
+    chrome_options.page_load_strategy = 'eager'
     # Keep headless mode commented out for now to observe scrolling
     chrome_options.add_argument("--headless") 
     chrome_options.add_argument("--no-sandbox")
@@ -52,7 +171,11 @@ def scrape_ipo_subscription_data(excel_file_path, url_column_name="URL_for_IPO_d
     chrome_options.add_argument("--window-size=1920,1080") 
     chrome_options.add_argument("--start-maximized") 
     chrome_options.add_argument("--incognito") 
+    # Some sites serve a slower bot path to the default headless user agent
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"]) 
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2}) # Don't load images
 
     # --- NEW: Additional options to try and suppress more verbose logging ---
     # These might help with some of the GPU/TensorFlow Lite messages, but might not remove all.
@@ -61,131 +184,409 @@ def scrape_ipo_subscription_data(excel_file_path, url_column_name="URL_for_IPO_d
     chrome_options.add_argument("--disable-setuid-sandbox")
     
     # Initialize Chrome WebDriver
+    driver = None
     try:
-        service = Service(ChromeDriverManager().install()) 
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.set_page_load_timeout(60) # Increased page load timeout
+        if driver_url:
+            # Reuse a long-lived driver server (see start_grid.py)
+            driver = webdriver.Remote(command_executor=driver_url, options=chrome_options)
+        else:
+            service = Service(driver_path or chromedriver_path()) 
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        # Remote sessions can't run CDP commands, so they rely on the image pref alone
+        if isinstance(driver, webdriver.Chrome):
+            # Skip images, fonts, stylesheets and ad/analytics scripts
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
     except Exception as e:
         print(f"Error initializing WebDriver: {e}")
+        if driver is not None:
+            # Don't leak a half-initialized session
+            driver.quit()
         return None
+    return driver
 
-    scraped_data = []
 
-    for url in ipo_urls:
-        company_name = "N/A" 
-        qib_sub = "N/A"
-        nii_sub = "N/A"
-        rii_sub = "N/A"
-        total_sub = "N/A"
+def _init_driver(driver_url=None, driver_path=None, host_next_slot=None, host_lock=None):
+    """Worker initializer: starts this process's Chrome and quits it on exit."""
+    global _driver, _host_next_slot, _host_lock
+    _host_next_slot = host_next_slot
+    _host_lock = host_lock
+    _driver = _create_driver(driver_url, driver_path)
+    if _driver is not None:
+        # Pool workers skip atexit hooks, so register with multiprocessing instead
+        mp_util.Finalize(None, _driver.quit, exitpriority=10)
+
+
+def _reserve_host_slot(url, host_next_slot, host_lock):
+    """
+    Reserves the next free request slot for url's host.
+
+    Both the HTTP fetches and the browser workers draw from the same schedule,
+    so a host sees at most one request per MIN_HOST_INTERVAL overall.
+
+    Returns:
+        float: Seconds the caller must wait before sending its request.
+    """
+    host = urlparse(url).netloc
+    # Only the reservation happens under the lock; callers sleep outside it so
+    # requests to other hosts aren't held up. time.time() rather than
+    # time.monotonic() because the slots are compared across processes.
+    with host_lock:
+        now = time.time()
+        slot = max(now, host_next_slot.get(host, 0.0))
+        host_next_slot[host] = slot + MIN_HOST_INTERVAL
+    return slot - now
+
+
+def _wait_for_host(url):
+    """Blocks until this worker may load a page from url's host."""
+    if _host_lock is None:
+        return
+    time.sleep(_reserve_host_slot(url, _host_next_slot, _host_lock))
 
-        try:
-            print(f"Navigating to: {url}")
-            driver.get(url)
 
-            # --- NEW: Scroll down to ensure content loads ---
-            # Scroll to the bottom of the page
+def _scrape_with_selenium(url):
+    """
+    Scrapes a single IPO page by driving a real browser.
+
+    Only used for pages whose subscription table is not in the raw HTML.
+    Runs inside a fallback worker process, each of which owns one driver.
+
+    Args:
+        url (str): The IPO page URL.
+
+    Returns:
+        dict: The scraped row (fields are "N/A" where scraping failed).
+    """
+    if _driver is None:
+        return _empty_row(url)
+    driver = _driver
+
+    row = _empty_row(url)
+
+    try:
+        # Only a page-load timeout is retried; a caption that never shows up on a
+        # loaded page won't appear on a second try either
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                print(f"Navigating to: {url}")
+                _wait_for_host(url)
+                driver.get(url)
+                break
+            except TimeoutException:
+                if attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                print(f"Timeout on {url} (attempt {attempt + 1}/{RETRY_ATTEMPTS}). Retrying...")
+                time.sleep(2 ** attempt)
+                driver.delete_all_cookies()
+
+        # Wait for the table caption to be present. driver.get() returns once the
+        # DOM is parsed, so this is usually satisfied on the first poll.
+        caption_locator = (By.XPATH, CAPTION_XPATH)
+        try:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located(caption_locator))
+        except TimeoutException:
+            # Only scroll when the table did not show up on its own, in case
+            # it is lazy-loaded further down the page
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3) # Give some time for content to load after scrolling
-
-            # Scroll back up slightly if the target element might be at the very bottom
-            # and obscured by footers or sticky elements. This might not be necessary.
-            # driver.execute_script("window.scrollTo(0, document.body.scrollHeight - 200);")
-            # time.sleep(1) 
-            # --- END NEW SCROLLING ---
-
-            # Wait for the table caption to be present (adjust timeout as needed)
-            WebDriverWait(driver, 30).until( 
-                EC.presence_of_element_located((By.XPATH, "//caption[contains(text(), 'IPO Bidding Live Updates from BSE, NSE')]"))
-            )
-            
-            # Get the page source after dynamic content loads
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-            # Extract company name from the page title or a prominent heading
-            title_match = re.search(r'^(.*?) IPO', driver.title)
-            if title_match:
-                company_name = title_match.group(1).strip()
-            else:
-                # Fallback to URL parsing for company name
-                url_parts = url.split('/')
-                for part in url_parts:
-                    if '-ipo' in part:
-                        company_name = part.replace('-ipo', '').replace('-', ' ').title()
-                        break
-            
-            # Find the table by its caption
-            ipo_table = soup.find('caption', string=lambda text: text and 'IPO Bidding Live Updates from BSE, NSE' in text)
-            
-            if ipo_table:
-                # Find the parent table element
-                table_element = ipo_table.find_parent('table')
-                if table_element:
-                    # Find all table rows in the tbody
-                    rows = table_element.find('tbody').find_all('tr')
-                    
-                    if rows:
-                        # The last row contains the final subscription data
-                        last_row = rows[-1]
-                        
-                        # Extract data using data-title attribute
-                        qib_td = last_row.find('td', {'data-title': lambda x: x and 'QIB' in x})
-                        nii_td = last_row.find('td', {'data-title': lambda x: x and 'NII' in x})
-                        rii_td = last_row.find('td', {'data-title': lambda x: x and 'RII' in x})
-                        total_td = last_row.find('td', {'data-title': lambda x: x and 'Total' in x})
-
-                        qib_sub = qib_td.get_text(strip=True) if qib_td else "N/A"
-                        nii_sub = nii_td.get_text(strip=True) if nii_td else "N/A"
-                        rii_sub = rii_td.get_text(strip=True) if rii_td else "N/A"
-                        total_sub = total_td.get_text(strip=True) if total_td else "N/A"
-                    else:
-                        print(f"No rows found in the table for {company_name} ({url})")
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located(caption_locator))
+
+        company_name = _extract_company_name(driver.title, url)
+        row = _empty_row(url, company_name)
+
+        # Query the last row inside the browser rather than pulling the whole
+        # page source across and parsing it in Python
+        last_rows = driver.find_elements(By.XPATH, LAST_ROW_XPATH)
+        if not last_rows:
+            print(f"No rows found in the table for {company_name} ({url})")
+        else:
+            for key in ("QIB", "NII", "RII", "Total"):
+                cells = last_rows[0].find_elements(By.CSS_SELECTOR, f"td[data-title*='{key}']")
+                if cells:
+                    # textContent also covers cells hidden by the responsive layout
+                    row[f"{key} Subscription"] = cells[0].get_attribute("textContent").strip()
+
+    except TimeoutException:
+        print(f"Timeout while loading or finding element on {url}. Page took too long to respond. Skipping this URL.")
+    except WebDriverException as e:
+        print(f"WebDriver error for {url}: {e}. This might indicate a browser crash or disconnection. Skipping this URL.")
+    except Exception as e:
+        print(f"Generic error scraping {url}: {e}")
+
+    return row
+
+
+async def selenium_fallback(url, executor):
+    """Runs the Selenium scrape for a URL on the fallback executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _scrape_with_selenium, url)
+
+
+def _is_transient(error):
+    """True for HTTP failures worth retrying: network errors, 429 and 5xx."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    # A malformed URL (e.g. no scheme) fails the same way every time
+    if isinstance(error, httpx.UnsupportedProtocol):
+        return False
+    return isinstance(error, httpx.TransportError)
+
+
+def _retry_delay(error, attempt):
+    """Seconds to wait before the next attempt, honouring a 429's Retry-After."""
+    delay = 2 ** attempt
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+        retry_after = error.response.headers.get("Retry-After", "")
+        # Only the delay-seconds form is handled; HTTP dates fall back to the backoff
+        if retry_after.isdigit():
+            delay = max(delay, min(int(retry_after), MAX_RETRY_AFTER))
+    return delay
+
+
+async def fetch(url, client, semaphore, throttle):
+    """
+    Fetches an IPO page over plain HTTP and parses the subscription table.
+
+    Args:
+        url (str): The IPO page URL.
+        client (httpx.AsyncClient): Shared HTTP client.
+        semaphore (asyncio.Semaphore): Bounds the number of in-flight requests.
+        throttle (callable): Coroutine function awaited before every request,
+                             retries included, to space out requests per host.
+
+    Returns:
+        dict: The scraped row (all N/A if the request failed), or None if the
+              page has to be rendered in a browser (no caption in the HTML, or a
+              status in BROWSER_FALLBACK_STATUSES).
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        await throttle(url)
+        async with semaphore:
+            try:
+                print(f"Fetching: {url}")
+                response = await client.get(url, headers={"User-Agent": USER_AGENT})
+                response.raise_for_status()
+                break
+            except httpx.HTTPError as e:
+                error = e
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in BROWSER_FALLBACK_STATUSES:
+            print(f"HTTP error for {url}: {error}. Falling back to the browser.")
+            return None
+        if not _is_transient(error):
+            # Dead links (404/410), malformed URLs etc. won't load in a browser either
+            print(f"HTTP error for {url}: {error}. Skipping this URL.")
+            return _empty_row(url, _extract_company_name("", url))
+        if attempt == RETRY_ATTEMPTS - 1:
+            # The host is down or overloaded; a browser would only hit the same wall
+            print(f"HTTP error for {url} after {RETRY_ATTEMPTS} attempts: {error}. Skipping this URL.")
+            return _empty_row(url, _extract_company_name("", url))
+        print(f"Transient HTTP error for {url} (attempt {attempt + 1}/{RETRY_ATTEMPTS}): {error}. Retrying...")
+        # Back off outside the semaphore so other URLs keep going
+        await asyncio.sleep(_retry_delay(error, attempt))
+    return _parse_subscription_table(response.text, url)
+
+
+def _cached_row(cache, url, ttl):
+    """Returns the cached row for url, or None if it is missing or older than ttl seconds."""
+    entry = cache.get(url)
+    # Entries without a timestamp predate the TTL and are treated as expired
+    if entry is None or "scraped_at" not in entry:
+        return None
+    if ttl is not None and time.time() - entry["scraped_at"] > ttl:
+        return None
+    return entry["row"]
+
+
+def _is_complete(row):
+    """True if the row holds real subscription figures worth caching."""
+    return row["Total Subscription"] != "N/A"
+
+
+async def _scrape_all(ipo_urls, cache, save_row, force_refresh=False, driver_url=None,
+                      cache_ttl=CACHE_TTL):
+    """
+    Scrapes every URL concurrently.
+
+    Rows are not collected here; save_row is called with each row as soon as
+    it is available, in completion order.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    executor = None
+    manager = None
+    executor_lock = asyncio.Lock()
+    browser_unavailable = False
+    host_next_slot = None
+    host_lock = None
+
+    async def throttle(url):
+        # Space out HTTP requests on the schedule the browser workers also use.
+        # The manager call is a blocking round-trip, so keep it off the event loop.
+        delay = await asyncio.to_thread(_reserve_host_slot, url, host_next_slot, host_lock)
+        await asyncio.sleep(delay)
+
+    async def get_executor():
+        # Each worker process starts its own driver once and reuses it. The pool
+        # is only created once some page actually needs the browser.
+        nonlocal executor, browser_unavailable
+        async with executor_lock:
+            if executor is None and not browser_unavailable:
+                try:
+                    # Resolve the driver once here rather than in every worker. This
+                    # may hit the network, so keep it off the event loop.
+                    driver_path = None if driver_url else await asyncio.to_thread(chromedriver_path)
+                except Exception as e:
+                    print(f"Error locating chromedriver: {e}. Pages that need the browser will be N/A.")
+                    browser_unavailable = True
                 else:
-                    print(f"Parent table element not found for caption for {company_name} ({url})")
-            else:
-                print(f"IPO Bidding Live Updates from BSE, NSE table caption not found for {company_name} ({url})")
+                    executor = ProcessPoolExecutor(max_workers=SELENIUM_WORKERS, initializer=_init_driver,
+                                                   initargs=(driver_url, driver_path,
+                                                             host_next_slot, host_lock))
+        return executor
 
-        except TimeoutException:
-            print(f"Timeout while loading or finding element on {url}. Page took too long to respond. Skipping this URL.")
-        except NoSuchElementException:
-            print(f"Element not found on {url} after scrolling. Table structure might be different. Skipping this URL.")
-        except WebDriverException as e:
-            print(f"WebDriver error for {url}: {e}. This might indicate a browser crash or disconnection. Skipping this URL.")
+    async def scrape_uncached(url, client):
+        row = await fetch(url, client, semaphore, throttle)
+        if row is None:
+            fallback_executor = await get_executor()
+            if fallback_executor is None:
+                return _empty_row(url)
+            row = await selenium_fallback(url, fallback_executor)
+        return row
+
+    async def scrape_one(url, client):
+        # Reuse recent rows; figures scraped while bidding is live go stale
+        cached_row = None if force_refresh else _cached_row(cache, url, cache_ttl)
+        if cached_row is not None:
+            save_row(cached_row)
+            return
+        try:
+            row = await scrape_uncached(url, client)
         except Exception as e:
+            # e.g. BrokenProcessPool if a Chrome worker was killed; one URL
+            # failing must not abort the whole run
             print(f"Generic error scraping {url}: {e}")
+            row = _empty_row(url)
+        if _is_complete(row):
+            cache[url] = {"row": row, "scraped_at": time.time()}
+        save_row(row)
+
+    try:
+        # Host slots live in a manager so the main process and every worker
+        # share one schedule
+        manager = multiprocessing.Manager()
+        host_next_slot = manager.dict()
+        host_lock = manager.Lock()
+        async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=30) as client:
+            await asyncio.gather(*(scrape_one(url, client) for url in ipo_urls))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True) # Closes the browsers
+        if manager is not None:
+            manager.shutdown()
+
+
+def scrape_ipo_subscription_data(excel_file_path, url_column_name="URL_for_IPO_details",
+                                 cache_path=CACHE_FILE, force_refresh=False,
+                                 output_csv_path='scraped_ipo_subscription_data.csv',
+                                 driver_url=None, cache_ttl=CACHE_TTL):
+    """
+    Scrapes QIB, NII, RII, and Total subscription data from IPO company pages.
+
+    Pages are fetched concurrently over HTTP and parsed directly; a pool of
+    headless Chrome workers is only started for pages whose table is missing
+    from the raw HTML. Successfully scraped rows are cached on disk by URL for
+    cache_ttl seconds, so reruns only hit the network for new or stale pages.
+    Every row is also appended to a CSV file as soon as it is scraped, so a
+    crash mid-run loses nothing.
+
+    Args:
+        excel_file_path (str): Path to the Excel file containing IPO links.
+        url_column_name (str): The name of the column in the Excel file that
+                                contains the corrected IPO URLs.
+        cache_path (str): Path of the shelve file used to cache scraped rows.
+        force_refresh (bool): If True, ignore cached rows and scrape every URL again.
+        output_csv_path (str): Path of the CSV file rows are written to as they arrive.
+        driver_url (str): URL of a running chromedriver/Selenium server to use for
+                          the browser fallback instead of starting a local driver.
+        cache_ttl (float): Seconds a cached row is reused before the page is scraped
+                           again. None never expires rows (only safe once every IPO
+                           in the sheet has closed).
+
+    Returns:
+        pandas.DataFrame: A DataFrame containing the scraped data, or None if an error occurs.
+    """
+    try:
+        # Only parse the URL column, not the whole workbook
+        df = pd.read_excel(excel_file_path, usecols=[url_column_name], engine='openpyxl', dtype=str)
+        
+        # Get the list of URLs from the specified column
+        ipo_urls = df[url_column_name].dropna().tolist()
 
-        # Append the collected data
-        scraped_data.append({
-            "Company Name": company_name,
-            "IPO Link": url,
-            "QIB Subscription": qib_sub,
-            "NII Subscription": nii_sub,
-            "RII Subscription": rii_sub,
-            "Total Subscription": total_sub
-        })
-        time.sleep(1) # Be polite and wait a bit between requests
-
-    driver.quit() # Close the browser
-
-    # Create a DataFrame from the scraped data
-    output_df = pd.DataFrame(scraped_data)
+    except FileNotFoundError:
+        print(f"Error: Excel file not found at {excel_file_path}")
+        return None
+    except ValueError:
+        # Raised by usecols when the column is missing
+        print(f"Error: Column '{url_column_name}' not found in the Excel file.")
+        print(f"Available columns: {pd.read_excel(excel_file_path, nrows=0).columns.tolist()}")
+        return None
+    except Exception as e:
+        print(f"Error reading Excel file: {e}")
+        return None
+
+    with shelve.open(cache_path) as cache, open(output_csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=OUTPUT_COLUMNS)
+        writer.writeheader()
+
+        def save_row(row):
+            writer.writerow(row)
+            csv_file.flush()
+
+        asyncio.run(_scrape_all(ipo_urls, cache, save_row, force_refresh=force_refresh,
+                                driver_url=driver_url, cache_ttl=cache_ttl))
+
+    # Build the DataFrame from the CSV instead of also keeping every row in memory.
+    # keep_default_na=False keeps the literal "N/A" placeholders as strings.
+    output_df = pd.read_csv(output_csv_path, dtype=str, keep_default_na=False)
+    # Rows were written in completion order; restore the order of the Excel file
+    url_order = {url: i for i, url in enumerate(ipo_urls)}
+    output_df = output_df.sort_values("IPO Link", key=lambda links: links.map(url_order),
+                                      kind="stable", ignore_index=True)
     return output_df
 
-# --- How to use the scraper ---
-# IMPORTANT: Replace 'your_excel_file.xlsm' with the actual path to your Excel file.
-# And replace 'Corrected_Link_Column' with the exact name of the column
-# where you stored the /ipo links.
-excel_input_file = 'GMP_enabled.xlsm' 
-url_col = 'URL_for_IPO_details' # Example column name
-
-print("Starting IPO data scraping...")
-scraped_ipo_df = scrape_ipo_subscription_data(excel_input_file, url_col)
-
-if scraped_ipo_df is not None:
-    # Save the results to a new Excel file
-    output_excel_file = 'scraped_ipo_subscription_data.xlsx'
-    scraped_ipo_df.to_excel(output_excel_file, index=False)
-    print(f"\nScraping complete! Data saved to '{output_excel_file}'")
-    print("\nSample of scraped data:")
-    print(scraped_ipo_df.head())
-else:
-    print("\nScraping failed or no data was retrieved.")
+
+def main():
+    # --- How to use the scraper ---
+    # IMPORTANT: Replace 'your_excel_file.xlsm' with the actual path to your Excel file.
+    # And replace 'Corrected_Link_Column' with the exact name of the column
+    # where you stored the /ipo links.
+    excel_input_file = 'GMP_enabled.xlsm' 
+    url_col = 'URL_for_IPO_details' # Example column name
+
+    output_csv_file = 'scraped_ipo_subscription_data.csv' # Rows are written here as they are scraped
+
+    parser = argparse.ArgumentParser(description="Scrape IPO subscription data.")
+    parser.add_argument("--driver-url", default=None,
+                        help="URL of a running chromedriver/Selenium server, e.g. http://localhost:9515 (see start_grid.py)")
+    args = parser.parse_args()
+
+    print("Starting IPO data scraping...")
+    scraped_ipo_df = scrape_ipo_subscription_data(excel_input_file, url_col, output_csv_path=output_csv_file,
+                                                  driver_url=args.driver_url)
+
+    if scraped_ipo_df is not None:
+        # Convert the results to an Excel file once at the end
+        output_excel_file = 'scraped_ipo_subscription_data.xlsx'
+        scraped_ipo_df.to_excel(output_excel_file, index=False)
+        print(f"\nScraping complete! Data saved to '{output_excel_file}'")
+        print("\nSample of scraped data:")
+        print(scraped_ipo_df.head())
+    else:
+        print("\nScraping failed or no data was retrieved.")
+
+
+# Guarded so importing the module (profilers, pool workers on spawn platforms)
+# doesn't start scraping
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Starts a long-lived chromedriver server for ipo_scraper.py to reuse.
+
+Run this once in a separate terminal, then point the scraper at it:
+
+    python start_grid.py --port 9515
+    python ipo_scraper.py --driver-url http://localhost:9515
+
+This skips the chromedriver download check and driver startup on every run.
+The binary is resolved like the scraper does, so CHROMEDRIVER_PATH is honoured.
+"""
+from ipo_scraper import chromedriver_path
+import argparse
+import subprocess
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start a persistent chromedriver server.")
+    parser.add_argument("--port", type=int, default=9515, help="Port to listen on")
+    args = parser.parse_args()
+
+    try:
+        driver_path = chromedriver_path()
+    except Exception as e:
+        print(f"Error locating chromedriver: {e}")
+        return
+
+    print(f"Starting chromedriver on http://localhost:{args.port} (Ctrl+C to stop)")
+    try:
+        subprocess.run([driver_path, f"--port={args.port}"], check=True)
+    except KeyboardInterrupt:
+        print("\nchromedriver stopped.")
+    except subprocess.CalledProcessError as e:
+        print(f"Error: chromedriver exited with status {e.returncode} (is port {args.port} already in use?)")
+    except OSError as e:
+        print(f"Error starting chromedriver at {driver_path}: {e}")
+
+
+if __name__ == "__main__":
+    main()